@@ -12,8 +12,12 @@ INSTRUCCIONES PARA CURSOR:
 2. Instala las dependencias: pip install -r requirements.txt
 3. Coloca el archivo 'Bases_de_datos_Airbnb.xlsx' en la misma carpeta
 4. Ejecuta este script: python airbnb_analysis_cursor.py
+   (opcional) Validación cruzada: python airbnb_analysis_cursor.py --cv 5 [--repeats 3] [--jobs N]
 """
 
+import argparse
+import os
+import sys
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
@@ -26,6 +30,15 @@ from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from cross_validation import add_cv_arguments, check_cv_arguments, cross_validate_models  # noqa: E402
+
+parser = argparse.ArgumentParser(description='Análisis y modelo predictivo de Airbnb')
+add_cv_arguments(parser)
+# parse_known_args: bajo IPython/Jupyter (Cursor) sys.argv trae argumentos del kernel
+args, _ = parser.parse_known_args()
+check_cv_arguments(parser, args)
+
 # Configuración de estilo
 plt.style.use('seaborn-v0_8-darkgrid')
 sns.set_palette("husl")
@@ -287,7 +300,9 @@ for name, model in models.items():
     r2 = r2_score(y_test, y_pred)
     rmse = np.sqrt(mean_squared_error(y_test, y_pred))
     mae = mean_absolute_error(y_test, y_pred)
-    mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
+    # MAPE sin precios 0 (misma definición que la validación cruzada en scripts/cross_validation.py)
+    nonzero = y_test != 0
+    mape = np.mean(np.abs((y_test[nonzero] - y_pred[nonzero]) / y_test[nonzero])) * 100
     
     results[name] = {
         'model': model,
@@ -300,6 +315,18 @@ for name, model in models.items():
 
 print("\n✅ Todos los modelos entrenados")
 
+# Validación cruzada (opcional): reemplaza las métricas de la división única por media ± desviación
+cv_enabled = args.cv > 0
+if cv_enabled:
+    print(f"\n🔁 Validación cruzada: {args.cv} folds × {args.repeats} repetición(es)...")
+    cv_results = cross_validate_models(models, X.values, y.values, folds=args.cv,
+                                       repeats=args.repeats, n_jobs=args.jobs)
+    for name in results:
+        results[name].update({k: v for k, v in cv_results[name].items() if k != 'fold_scores'})
+        r = results[name]
+        print(f"   • {name}: R² {r['r2']:.4f} ± {r['r2_std']:.4f} | "
+              f"MAE ${r['mae']:.2f} ± {r['mae_std']:.2f} | MAPE {r['mape']:.2f}% ± {r['mape_std']:.2f}")
+
 # ============================================================================
 # 6. COMPARACIÓN DE MODELOS
 # ============================================================================
@@ -314,6 +341,11 @@ comparison_df = pd.DataFrame({
     'MAE': [results[m]['mae'] for m in results],
     'MAPE (%)': [results[m]['mape'] for m in results]
 })
+if cv_enabled:
+    comparison_df['R² Std'] = [results[m]['r2_std'] for m in results]
+    comparison_df['RMSE Std'] = [results[m]['rmse_std'] for m in results]
+    comparison_df['MAE Std'] = [results[m]['mae_std'] for m in results]
+    comparison_df['MAPE Std (%)'] = [results[m]['mape_std'] for m in results]
 
 comparison_df = comparison_df.sort_values('R² Score', ascending=False)
 print(f"\n{comparison_df.to_string(index=False)}")
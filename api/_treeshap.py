@@ -0,0 +1,151 @@
+"""
+Exact path-dependent TreeSHAP over flattened tree arrays (no sampling).
+Shared by api/predict.py (per-request explanations) and scripts/export_model.py
+(tree_paths.npz and global attribution summaries). The leading underscore keeps
+Vercel from exposing this file as an endpoint.
+
+Every leaf of every tree is stored as one row:
+  lo, hi  (L, M)  interval of each feature that reaches the leaf (lo < x <= hi)
+  z       (L, M)  product of cover ratios of the splits on each feature along the path
+  v       (L,)    leaf value, already scaled by the ensemble weight
+Features that are not split on along a path have lo=-inf, hi=inf, z=1; such a
+feature is a dummy player for that leaf and does not change the other attributions.
+With the model's few features (M=6), TreeSHAP's EXTEND/UNWIND run as a handful of
+NumPy operations over all leaves at once.
+
+Cost: path-dependent TreeSHAP visits every leaf for every row, so time is linear in
+leaves x rows (roughly 0.6 us per leaf-row visit here). A forest of deep trees has orders of
+magnitude more leaves than a shallow boosted ensemble, so callers size batches from a
+leaf-row budget with max_rows() rather than a fixed row count.
+"""
+
+import math
+import numpy as np
+
+# Upper bound on samples x leaves held in memory per chunk
+CHUNK_ELEMENTS = 2_000_000
+
+
+def _tree_estimators(model):
+    """Return (trees, weight) for supported sklearn tree models, or (None, None)."""
+    name = type(model).__name__
+    if name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        return list(model.estimators_), 1.0 / len(model.estimators_)
+    if name == "GradientBoostingRegressor":
+        return [est for est in model.estimators_[:, 0]], float(model.learning_rate)
+    if name in ("DecisionTreeRegressor", "ExtraTreeRegressor"):
+        return [model], 1.0
+    return None, None
+
+
+def tree_paths(model):
+    """
+    Flatten a fitted tree model into leaf-path arrays. Returns None for non-tree models.
+    `offset` is the part of the prediction not produced by the trees (GB's initial estimate).
+    """
+    trees, weight = _tree_estimators(model)
+    if trees is None:
+        return None
+    n_features = int(model.n_features_in_)
+    lo, hi, z, v = [], [], [], []
+    for est in trees:
+        t = est.tree_
+        cover = t.weighted_n_node_samples
+        stack = [(0, np.full(n_features, -np.inf), np.full(n_features, np.inf), np.ones(n_features))]
+        while stack:
+            node, node_lo, node_hi, node_z = stack.pop()
+            left, right = t.children_left[node], t.children_right[node]
+            if left == -1:
+                lo.append(node_lo)
+                hi.append(node_hi)
+                z.append(node_z)
+                v.append(t.value[node, 0, 0] * weight)
+                continue
+            f, thr = t.feature[node], t.threshold[node]
+            left_hi, left_z = node_hi.copy(), node_z.copy()
+            left_hi[f] = min(left_hi[f], thr)
+            left_z[f] *= cover[left] / cover[node]
+            right_lo, right_z = node_lo.copy(), node_z.copy()
+            right_lo[f] = max(right_lo[f], thr)
+            right_z[f] *= cover[right] / cover[node]
+            stack.append((left, node_lo, left_hi, left_z))
+            stack.append((right, right_lo, node_hi, right_z))
+    paths = {
+        "lo": np.array(lo),
+        "hi": np.array(hi),
+        "z": np.array(z),
+        "v": np.array(v),
+    }
+    probe = np.zeros((1, n_features))
+    paths["offset"] = np.array(float(model.predict(probe)[0]) - float(_leaf_sum(paths, probe)[0]))
+    return paths
+
+
+def _leaf_sum(paths, X):
+    """Sum of the leaf values each row of X reaches; equals the tree part of model.predict."""
+    X = _as_tree_input(X)
+    inside = np.all((X[:, None, :] > paths["lo"]) & (X[:, None, :] <= paths["hi"]), axis=2)
+    return inside @ paths["v"]
+
+
+def _as_tree_input(X):
+    # sklearn trees compare float32 features against float64 thresholds
+    return np.asarray(X, dtype=np.float32).astype(np.float64)
+
+
+def base_value(paths):
+    """Expected model output over the training cover (the SHAP base value)."""
+    return float(paths["offset"] + np.sum(paths["v"] * np.prod(paths["z"], axis=1)))
+
+
+def max_rows(paths, leaf_row_budget):
+    """Largest number of rows whose explanation stays within leaf_row_budget leaf visits (at least 1)."""
+    return max(1, int(leaf_row_budget) // max(1, len(paths["v"])))
+
+
+def tree_shap(paths, X):
+    """
+    Exact TreeSHAP attributions for the rows of X (already scaled like the model input).
+    Returns (base, phi) with phi of shape (n, M) and base + phi.sum(axis=1) == model.predict(X).
+    """
+    X = _as_tree_input(X)
+    n, m = X.shape
+    lo, hi, z, v = paths["lo"], paths["hi"], paths["z"], paths["v"]
+    n_leaves = len(v)
+    # Shapley weight of a coalition of size k among m players: k! (m - k - 1)! / m!
+    w = np.array([math.factorial(k) * math.factorial(m - k - 1) / math.factorial(m) for k in range(m)])
+    phi = np.zeros((n, m))
+    step = max(1, CHUNK_ELEMENTS // max(1, n_leaves * m))
+    for start in range(0, n, step):
+        xb = X[start:start + step]
+        o = ((xb[:, None, :] > lo) & (xb[:, None, :] <= hi)).astype(np.float64)  # (b, L, M)
+        # EXTEND: coefficients of prod_j (z_j + o_j t), one polynomial per (row, leaf)
+        c = np.zeros((m + 1,) + o.shape[:2])
+        c[0] = 1.0
+        for j in range(m):
+            c[1:j + 2] = c[1:j + 2] * z[:, j] + c[0:j + 1] * o[:, :, j]
+            c[0] = c[0] * z[:, j]
+        # UNWIND, i.e. sum_k w_k q_k with q = c / (z_i + o_i t), without materialising q.
+        # o_i = 0: q = c / z_i, so the sum is (w . c) / z_i, shared by every feature.
+        # o_i = 1: q_{k-1} = c_k - z_i q_k, so the sum is sum_r c_r g_r(z_i) with the
+        #          Horner recurrence g_1 = w_0, g_r = w_{r-1} - z_i g_{r-1}.
+        wc = np.tensordot(w, c[:m], axes=1)  # (b, L)
+        for i in range(m):
+            zi, oi = z[:, i], o[:, :, i]
+            g = np.full(n_leaves, w[0])
+            total = c[1] * g
+            for r in range(2, m + 1):
+                g = w[r - 1] - zi * g
+                total += c[r] * g
+            total = np.where(oi > 0, total, wc / zi)
+            phi[start:start + step, i] = (total * (oi - zi)) @ v
+    return base_value(paths), phi
+
+
+def save_paths(paths, path):
+    np.savez_compressed(path, **paths)
+
+
+def load_paths(path):
+    with np.load(path) as data:
+        return {k: data[k] for k in data.files}
@@ -1,23 +1,57 @@
 """
 Vercel Python serverless function: POST /api/predict
 Body: { room_type, minimum_nights, number_of_reviews, reviews_per_month, availability_365, calculated_host_listings_count }
+      or { instances: [ {...}, ... ] } for batch prediction
 Returns: { predicted_price, interval_low, interval_high, mae }
+      or { predictions: [ {...} | null, ... ], errors: [ { index, fields }, ... ], mae } for batch
+Invalid single payloads return 400 with { error, fields } (one message per field).
+Add "explain": true to either form to attach { base_value, contributions } to each prediction:
+exact TreeSHAP attributions per entry of FEATURE_ORDER, where base_value + sum(contributions)
+is the model output before clipping at 0 and rounding. Explained batches hold at most
+MAX_EXPLAIN_BATCH_SIZE rows, fewer when the model's leaves exceed MAX_EXPLAIN_LEAF_ROWS.
+
+GET /api/predict
+Returns drift scores (PSI and binned KS) of the inputs and predictions seen by this
+instance against reference_distributions.json from scripts/export_model.py.
+Live histograms are fixed-size counters, so memory does not grow with traffic.
 """
 
 import os
+import sys
 from http.server import BaseHTTPRequestHandler
 import json
 import joblib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _treeshap import tree_paths, tree_shap, load_paths, max_rows  # noqa: E402
 
 MODEL_DIR = os.path.join(os.path.dirname(__file__), "..", "model_artifacts")
 FEATURE_ORDER = [
     "minimum_nights",
     "number_of_reviews",
     "reviews_per_month",
-    "availability_365",
     "calculated_host_listings_count",
+    "availability_365",
     "room_type_encoded",
 ]
+# Numeric input fields: (default, min, max). None means unbounded.
+FIELD_SCHEMA = {
+    "minimum_nights": (1, 0, None),
+    "number_of_reviews": (0, 0, None),
+    "reviews_per_month": (0, 0, None),
+    "availability_365": (365, 0, 365),
+    "calculated_host_listings_count": (1, 0, None),
+}
+DEFAULT_ROOM_TYPE = "Entire home/apt"
+MAX_BATCH_SIZE = 1000
+MAX_EXPLAIN_BATCH_SIZE = 100
+# Leaf-row visits one explain request may spend (see api/_treeshap.py)
+MAX_EXPLAIN_LEAF_ROWS = 2_000_000
+DRIFT_EVAL_EVERY = 200
+DRIFT_MIN_OBSERVATIONS = 100
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
 
 
 def load_artifacts():
@@ -42,48 +76,278 @@ def load_artifacts():
 MODEL, SCALER, LABEL_ENCODER, MAE = load_artifacts()
 
 
-def predict(body):
+def load_explainer():
+    """Leaf-path arrays for TreeSHAP: tree_paths.npz from export, else built from the model."""
     if MODEL is None:
-        return {"error": "Model not loaded. Run scripts/export_model.py and deploy with model_artifacts."}
-    room_type = str(body.get("room_type", "Entire home/apt"))
-    room_type_encoded = LABEL_ENCODER.get(room_type, LABEL_ENCODER.get("Entire home/apt", 0))
-    features = [
-        float(body.get("minimum_nights", 1)),
-        float(body.get("number_of_reviews", 0)),
-        float(body.get("reviews_per_month", 0)),
-        float(body.get("availability_365", 365)),
-        float(body.get("calculated_host_listings_count", 1)),
-        float(room_type_encoded),
-    ]
-    X = [features]
-    X_scaled = SCALER.transform(X)
-    pred = float(MODEL.predict(X_scaled)[0])
-    pred = max(0, pred)
+        return None
+    path = os.path.join(MODEL_DIR, "tree_paths.npz")
+    if os.path.exists(path):
+        return load_paths(path)
+    return tree_paths(MODEL)
+
+
+TREE_PATHS = load_explainer()
+
+
+def explainable():
+    """True when explain() can attribute this model's predictions (tree ensembles and linear models)."""
+    return TREE_PATHS is not None or hasattr(MODEL, "coef_")
+
+
+def explain(X_scaled):
+    """Return (base_value, contributions array) for scaled rows, or None if the model is unsupported."""
+    if TREE_PATHS is not None:
+        return tree_shap(TREE_PATHS, X_scaled)
+    if hasattr(MODEL, "coef_"):
+        # Linear model: exact SHAP against the training mean, which is 0 after scaling
+        return float(MODEL.intercept_), X_scaled * MODEL.coef_
+    return None
+
+
+def explain_limit():
+    """Most instances one explain request may carry; large forests get fewer than MAX_EXPLAIN_BATCH_SIZE."""
+    if TREE_PATHS is None:
+        return MAX_EXPLAIN_BATCH_SIZE
+    return min(MAX_EXPLAIN_BATCH_SIZE, max_rows(TREE_PATHS, MAX_EXPLAIN_LEAF_ROWS))
+
+
+def load_reference():
+    path = os.path.join(MODEL_DIR, "reference_distributions.json")
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        ref = json.load(f)
+    hists = {name: ref["features"][name] for name in FEATURE_ORDER if name in ref["features"]}
+    if "prediction" in ref:
+        hists["prediction"] = ref["prediction"]
     return {
+        name: {"edges": np.asarray(h["edges"], dtype=float), "expected": np.asarray(h["counts"], dtype=float)}
+        for name, h in hists.items()
+    }
+
+
+REFERENCE = load_reference()
+LIVE_COUNTS = {name: np.zeros(len(h["expected"]), dtype=np.int64) for name, h in (REFERENCE or {}).items()}
+DRIFT_STATE = {"observations": 0, "last_eval": 0, "scores": None}
+
+
+def _psi(expected, actual, eps=1e-4):
+    e = np.maximum(expected / expected.sum(), eps)
+    a = np.maximum(actual / actual.sum(), eps)
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _binned_ks(expected, actual):
+    return float(np.max(np.abs(np.cumsum(expected) / expected.sum() - np.cumsum(actual) / actual.sum())))
+
+
+def record_observations(X, preds):
+    """Add validated feature rows and their predictions to the live histograms."""
+    if REFERENCE is None or len(X) == 0:
+        return
+    for col, name in enumerate(FEATURE_ORDER):
+        if name in REFERENCE:
+            bins = np.searchsorted(REFERENCE[name]["edges"], X[:, col], side="right")
+            LIVE_COUNTS[name] += np.bincount(bins, minlength=len(LIVE_COUNTS[name]))
+    if "prediction" in REFERENCE:
+        bins = np.searchsorted(REFERENCE["prediction"]["edges"], preds, side="right")
+        LIVE_COUNTS["prediction"] += np.bincount(bins, minlength=len(LIVE_COUNTS["prediction"]))
+    DRIFT_STATE["observations"] += len(X)
+    if DRIFT_STATE["observations"] - DRIFT_STATE["last_eval"] >= DRIFT_EVAL_EVERY:
+        compute_drift()
+
+
+def compute_drift():
+    n = DRIFT_STATE["observations"]
+    scores = {}
+    if n > 0:
+        for name, h in REFERENCE.items():
+            actual = LIVE_COUNTS[name].astype(float)
+            scores[name] = {
+                "psi": round(_psi(h["expected"], actual), 4),
+                "ks": round(_binned_ks(h["expected"], actual), 4),
+            }
+    DRIFT_STATE["scores"] = scores
+    DRIFT_STATE["last_eval"] = n
+    return scores
+
+
+def drift_report():
+    if REFERENCE is None:
+        return {"error": "Reference distributions not found. Run scripts/export_model.py to generate them."}
+    n = DRIFT_STATE["observations"]
+    scores = DRIFT_STATE["scores"]
+    if scores is None or DRIFT_STATE["last_eval"] != n:
+        scores = compute_drift()
+    max_psi = max((s["psi"] for s in scores.values()), default=0.0)
+    if n < DRIFT_MIN_OBSERVATIONS:
+        status = "insufficient_data"
+    elif max_psi >= PSI_SIGNIFICANT:
+        status = "significant"
+    elif max_psi >= PSI_MODERATE:
+        status = "moderate"
+    else:
+        status = "stable"
+    return {
+        "observations": n,
+        "status": status,
+        "max_psi": max_psi,
+        "retrain_recommended": status == "significant",
+        "scores": scores,
+    }
+
+
+# JSON numbers decode to int/float; numeric strings are also accepted (bool is not, though it subclasses int)
+_NUMBER_TYPES = {int, float}
+_COERCIBLE_TYPES = {int, float, str}
+
+
+def _coerce_column(values):
+    """Vectorized float coercion; returns (array, invalid_mask) with NaN where coercion failed."""
+    # One C-level pass over the types decides whether NumPy can convert the whole column at once
+    if set(map(type, values)) <= _NUMBER_TYPES:
+        try:
+            out = np.asarray(values, dtype=float)
+            return out, ~np.isfinite(out)
+        except OverflowError:  # an int beyond float range; locate it below
+            pass
+    out = np.full(len(values), np.nan)
+    for i, v in enumerate(values):
+        if type(v) in _COERCIBLE_TYPES:
+            try:
+                out[i] = float(v)
+            except (ValueError, OverflowError):
+                pass
+    return out, ~np.isfinite(out)
+
+
+def validate_rows(rows):
+    """
+    Validate and coerce a list of payload dicts against FIELD_SCHEMA.
+    Returns (X, errors): X is an (n, len(FEATURE_ORDER)) float array in FEATURE_ORDER,
+    errors maps row index -> { field: message } for rejected rows.
+    """
+    n = len(rows)
+    errors = {}
+
+    def add_error(mask, field, message):
+        for i in np.flatnonzero(mask):
+            errors.setdefault(int(i), {})[field] = message
+
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[i] = {"_row": "expected a JSON object"}
+    rows = [row if isinstance(row, dict) else {} for row in rows]
+
+    X = np.zeros((n, len(FEATURE_ORDER)))
+    for col, field in enumerate(FEATURE_ORDER[:-1]):
+        default, lo, hi = FIELD_SCHEMA[field]
+        values, invalid = _coerce_column([row.get(field, default) for row in rows])
+        add_error(invalid, field, "must be a finite number")
+        valid = ~invalid
+        if lo is not None:
+            add_error(valid & (values < lo), field, f"must be >= {lo}")
+        if hi is not None:
+            add_error(valid & (values > hi), field, f"must be <= {hi}")
+        X[:, col] = values
+
+    room_types = [row.get("room_type", DEFAULT_ROOM_TYPE) for row in rows]
+    codes = np.array([LABEL_ENCODER.get(str(rt), -1) if isinstance(rt, str) else -1 for rt in room_types])
+    allowed = ", ".join(sorted(LABEL_ENCODER))
+    add_error(codes < 0, "room_type", f"must be one of: {allowed}")
+    X[:, -1] = codes
+    return X, errors
+
+
+def _format_prediction(pred, base=None, contributions=None):
+    pred = max(0, float(pred))
+    result = {
         "predicted_price": round(pred, 2),
         "interval_low": round(max(0, pred - MAE), 2),
         "interval_high": round(pred + MAE, 2),
         "mae": MAE,
     }
+    if contributions is not None:
+        result["explanation"] = {
+            "base_value": round(base, 4),
+            "contributions": {name: round(float(c), 4) for name, c in zip(FEATURE_ORDER, contributions)},
+        }
+    return result
+
+
+def predict(body):
+    if MODEL is None:
+        return {"error": "Model not loaded. Run scripts/export_model.py and deploy with model_artifacts."}
+    if not isinstance(body, dict):
+        return {"error": "Body must be a JSON object."}
+    batch = "instances" in body
+    rows = body["instances"] if batch else [body]
+    if not isinstance(rows, list) or not rows:
+        return {"error": "instances must be a non-empty list."}
+    if len(rows) > MAX_BATCH_SIZE:
+        return {"error": f"instances must contain at most {MAX_BATCH_SIZE} items."}
+    want_explain = body.get("explain", False)
+    if not isinstance(want_explain, bool):
+        return {"error": "explain must be a JSON boolean."}
+    if want_explain and not explainable():
+        return {"error": f"Explanations are not available for {type(MODEL).__name__}."}
+    if want_explain and len(rows) > explain_limit():
+        return {"error": f"explain supports at most {explain_limit()} instances per request for this model."}
+
+    X, errors = validate_rows(rows)
+    if not batch and errors:
+        return {"error": "Invalid input.", "fields": errors[0]}
+
+    # Only rows that passed validation reach the scaler and model
+    ok = np.ones(len(rows), dtype=bool)
+    ok[list(errors)] = False
+    preds = np.full(len(rows), np.nan)
+    contributions = [None] * len(rows)
+    base = None
+    if ok.any():
+        X_scaled = SCALER.transform(X[ok])
+        preds[ok] = MODEL.predict(X_scaled)
+        if want_explain:
+            base, phi = explain(X_scaled)
+            for row, idx in enumerate(np.flatnonzero(ok)):
+                contributions[idx] = phi[row]
+        # Recorded last, so only requests that get an answer reach the drift histograms
+        record_observations(X[ok], preds[ok])
+
+    if not batch:
+        return _format_prediction(preds[0], base, contributions[0])
+    return {
+        "predictions": [
+            _format_prediction(p, base, contributions[i]) if ok[i] else None for i, p in enumerate(preds)
+        ],
+        "errors": [{"index": i, "fields": errors[i]} for i in sorted(errors)],
+        "mae": MAE,
+    }
 
 
 class handler(BaseHTTPRequestHandler):
+    def _send_json(self, status, result):
+        # Every response, errors included, carries the CORS header so browsers can read the body
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(json.dumps(result).encode("utf-8"))
+
+    def do_GET(self):
+        result = drift_report()
+        self._send_json(404 if "error" in result else 200, result)
+
     def do_POST(self):
         try:
             content_length = int(self.headers.get("Content-Length", 0))
             body_raw = self.rfile.read(content_length).decode("utf-8") if content_length else "{}"
             body = json.loads(body_raw)
             result = predict(body)
-            if "error" in result:
-                self.send_response(400)
-            else:
-                self.send_response(200)
-            self.send_header("Content-Type", "application/json")
-            self.send_header("Access-Control-Allow-Origin", "*")
-            self.end_headers()
-            self.wfile.write(json.dumps(result).encode("utf-8"))
+            self._send_json(400 if "error" in result else 200, result)
+        except UnicodeDecodeError as e:
+            self._send_json(400, {"error": f"Body must be UTF-8: {e}"})
+        except json.JSONDecodeError as e:
+            self._send_json(400, {"error": f"Invalid JSON: {e}"})
         except Exception as e:
-            self.send_response(500)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            self.wfile.write(json.dumps({"error": str(e)}).encode("utf-8"))
+            self._send_json(500, {"error": str(e)})
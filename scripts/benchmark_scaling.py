@@ -0,0 +1,172 @@
+"""
+Scaling benchmark: training time, peak memory and artifact size against row count.
+Run from project root: python scripts/benchmark_scaling.py --rows 10000 100000 1000000
+Requires: Bases_de_datos_Airbnb.xlsx in project root or public/ (to fit the synthetic generator)
+Output: benchmark_scaling.csv (one row per size and candidate model) and a printed table
+
+Each size is generated in chunks by scripts/synthetic_data.py; every chunk is encoded with
+export_model.encode_features() and written straight to .npy memmaps, then trimmed, split 80/20
+and scaled like scripts/export_model.py, so the parent's memory does not grow with the generated
+columns. Every fit runs in
+a fresh worker process that memory-maps the prepared arrays. Memory is read from the worker's
+/proc/self/status (Linux): peak_rss_mb is VmHWM, the high-water mark, reset just before the fit;
+fit_rss_delta_mb is that peak minus VmRSS before the fit. ru_maxrss is not used because it survives
+fork/exec, so a spawned worker would report the parent's peak. Where /proc is missing, both are NaN.
+predict_ms_1k is the batch latency /api/predict would see for 1,000 rows.
+"""
+
+import os
+import time
+import tempfile
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import joblib
+from numpy.lib.format import open_memmap
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from export_model import PROJECT_ROOT, load_data, encode_features, build_models
+from synthetic_data import fit, generate
+
+DEFAULT_ROWS = [10_000, 100_000, 1_000_000]
+OUT_PATH = os.path.join(PROJECT_ROOT, "benchmark_scaling.csv")
+STATUS_PATH = "/proc/self/status"
+
+
+def _status_mb(field):
+    """VmRSS / VmHWM of this process in MB, or NaN without /proc."""
+    try:
+        with open(STATUS_PATH) as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 2**10  # reported in kB
+    except OSError:
+        pass
+    return float("nan")
+
+
+def _reset_peak_rss():
+    # Writing 5 to clear_refs resets VmHWM to the current RSS (Linux >= 4.0)
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _fit_once(model_name, data_dir):
+    X_train = np.load(os.path.join(data_dir, "X_train.npy"), mmap_mode="r")
+    y_train = np.load(os.path.join(data_dir, "y_train.npy"), mmap_mode="r")
+    X_probe = np.load(os.path.join(data_dir, "X_probe.npy"))
+    rss_before = _status_mb("VmRSS")
+    _reset_peak_rss()
+
+    model = build_models()[model_name]
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+    peak_rss = _status_mb("VmHWM")
+
+    t0 = time.perf_counter()
+    model.predict(X_probe)
+    predict_ms = (time.perf_counter() - t0) * 1000
+
+    artifact = os.path.join(data_dir, f"{model_name}.joblib")
+    joblib.dump(model, artifact)
+    artifact_kb = os.path.getsize(artifact) / 1024
+    os.remove(artifact)
+    return {
+        "fit_s": fit_s,
+        "peak_rss_mb": peak_rss,
+        "fit_rss_delta_mb": max(0.0, peak_rss - rss_before),
+        "artifact_kb": artifact_kb,
+        "predict_ms_1k": predict_ms,
+    }
+
+
+def _prepare_chunks(params, n_rows, chunk_size, seed, data_dir):
+    """
+    Generate chunks and write each one's encoded features and price straight to .npy memmaps,
+    so the parent never holds the generated frame (names, ids, dates) for the whole size.
+    """
+    le = LabelEncoder().fit(params["room_types"])
+    X_all = y_all = None
+    start = 0
+    for chunk in generate(params, n_rows, chunk_size, seed):
+        X, y = encode_features(chunk, le)
+        if X_all is None:
+            X_all = open_memmap(os.path.join(data_dir, "X_all.npy"), mode="w+", dtype=np.float64,
+                                shape=(n_rows, X.shape[1]))
+            y_all = open_memmap(os.path.join(data_dir, "y_all.npy"), mode="w+", dtype=np.float64, shape=(n_rows,))
+        X_all[start:start + len(X)] = X.values
+        y_all[start:start + len(y)] = y.values
+        start += len(X)
+    return X_all, y_all
+
+
+def prepare(params, n_rows, chunk_size, seed, data_dir):
+    """
+    Same rows as prepare_features() + the 80/20 split + StandardScaler in scripts/export_model.py,
+    built chunk by chunk. room_type codes follow the generator's room types, which equal
+    prepare_features' encoder whenever every type occurs (always, at benchmark sizes).
+    """
+    t0 = time.perf_counter()
+    X_all, y_all = _prepare_chunks(params, n_rows, chunk_size, seed, data_dir)
+    gen_s = time.perf_counter() - t0
+
+    kept = np.flatnonzero(y_all <= np.quantile(y_all, 0.99))
+    # Splitting the row indices draws the same permutation as train_test_split(X, y, ...)
+    train_idx, _ = train_test_split(kept, test_size=0.2, random_state=42)
+    scaler = StandardScaler()
+    for i in range(0, len(train_idx), chunk_size):
+        scaler.partial_fit(X_all[train_idx[i:i + chunk_size]])
+    X_train = open_memmap(os.path.join(data_dir, "X_train.npy"), mode="w+", dtype=np.float64,
+                          shape=(len(train_idx), X_all.shape[1]))
+    for i in range(0, len(train_idx), chunk_size):
+        X_train[i:i + chunk_size] = scaler.transform(X_all[train_idx[i:i + chunk_size]])
+    np.save(os.path.join(data_dir, "y_train.npy"), y_all[train_idx])
+    np.save(os.path.join(data_dir, "X_probe.npy"), X_train[:1000])
+    X_train.flush()
+    del X_all, y_all, X_train
+    for name in ("X_all.npy", "y_all.npy"):
+        os.remove(os.path.join(data_dir, name))
+    return gen_s, len(train_idx)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark candidate models on synthetic data of growing size.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS, help="dataset sizes to test")
+    parser.add_argument("--models", nargs="+", default=list(build_models()),
+                        help="candidate models to include (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=500_000, help="rows per generated chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=OUT_PATH, help="CSV output path")
+    args = parser.parse_args()
+
+    params = fit(load_data())
+    records = []
+    ctx = multiprocessing.get_context("spawn")
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory(prefix="airbnb_bench_") as data_dir:
+            gen_s, n_train = prepare(params, n_rows, args.chunk_size, args.seed, data_dir)
+            print(f"{n_rows:>10,} rows: generated in {gen_s:.1f}s, training on {n_train:,}")
+            for model_name in args.models:
+                # One process per fit so each model starts from a clean heap
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    result = pool.submit(_fit_once, model_name, data_dir).result()
+                records.append({"rows": n_rows, "train_rows": n_train, "model": model_name, **result})
+                print(
+                    f"    {model_name:<18} fit {result['fit_s']:>8.2f}s  peak RSS {result['peak_rss_mb']:>8.1f} MB  "
+                    f"artifact {result['artifact_kb']:>10.1f} KB  predict 1k {result['predict_ms_1k']:>7.1f} ms"
+                )
+
+    pd.DataFrame(records).to_csv(args.out, index=False)
+    print(f"Saved {len(records)} results to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+K-fold / repeated K-fold evaluation of the candidate models.
+Used by scripts/export_model.py and airbnb_analysis_cursor.py (--cv K [--repeats R] [--jobs N]).
+
+X and y are written once to .npy files and reopened read-only with mmap_mode, so every
+worker process maps the same pages instead of receiving a pickled copy of the data.
+Each (model, fold) pair is an independent task; the scaler is fit inside the training fold.
+"""
+
+import os
+import tempfile
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import KFold, RepeatedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
+
+METRICS = ["r2", "rmse", "mae", "mape"]
+
+
+def add_cv_arguments(parser):
+    parser.add_argument("--cv", type=int, default=0, metavar="K",
+                        help="evaluate with K-fold cross-validation instead of a single 80/20 split")
+    parser.add_argument("--repeats", type=int, default=1, metavar="R",
+                        help="repeat the K-fold split R times with different shuffles (default: 1)")
+    parser.add_argument("--jobs", type=int, default=-1, metavar="N",
+                        help="worker processes for the folds (default: all cores)")
+
+
+def check_cv_arguments(parser, args):
+    """Reject values add_cv_arguments accepts as ints but cannot honour, instead of falling back to hold-out."""
+    if args.cv != 0 and args.cv < 2:
+        parser.error(f"--cv needs at least 2 folds (or 0 for the 80/20 split), got {args.cv}")
+    if args.repeats < 1:
+        parser.error(f"--repeats must be at least 1, got {args.repeats}")
+    if args.jobs == 0:
+        parser.error("--jobs must be a positive worker count or negative (-1 = all cores), got 0")
+
+
+def score_predictions(y_true, y_pred):
+    """
+    r2, rmse, mae and mape for one evaluation. Shared by the hold-out and CV paths so the
+    reliability thresholds mean the same thing in both. Zero-price listings would dominate MAPE
+    through a division guard, so they are left out of MAPE only.
+    """
+    y_true = np.asarray(y_true, dtype=float)
+    y_pred = np.asarray(y_pred, dtype=float)
+    nonzero = y_true != 0
+    return {
+        "r2": float(r2_score(y_true, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "mae": float(mean_absolute_error(y_true, y_pred)),
+        "mape": float(np.mean(np.abs((y_true[nonzero] - y_pred[nonzero]) / y_true[nonzero])) * 100),
+    }
+
+
+def _run_fold(name, estimator, X, y, train_idx, test_idx):
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X[train_idx])
+    X_test = scaler.transform(X[test_idx])
+    model = clone(estimator)
+    model.fit(X_train, y[train_idx])
+    return name, score_predictions(y[test_idx], model.predict(X_test))
+
+
+def cross_validate_models(models, X, y, folds=5, repeats=1, n_jobs=-1, random_state=42):
+    """
+    Evaluate every model in `models` (name -> unfitted estimator) on the same folds.
+    Returns name -> { "r2", "r2_std", "rmse", "rmse_std", ..., "fold_scores": [...] }.
+    """
+    # Ship unfitted copies: a fitted forest would be pickled to every task instead of the memmap
+    models = {name: clone(estimator) for name, estimator in models.items()}
+    X = np.ascontiguousarray(X, dtype=np.float64)
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    if repeats > 1:
+        splitter = RepeatedKFold(n_splits=folds, n_repeats=repeats, random_state=random_state)
+    else:
+        splitter = KFold(n_splits=folds, shuffle=True, random_state=random_state)
+    splits = list(splitter.split(X))
+
+    with tempfile.TemporaryDirectory(prefix="airbnb_cv_") as tmp:
+        np.save(os.path.join(tmp, "X.npy"), X)
+        np.save(os.path.join(tmp, "y.npy"), y)
+        X_mm = np.load(os.path.join(tmp, "X.npy"), mmap_mode="r")
+        y_mm = np.load(os.path.join(tmp, "y.npy"), mmap_mode="r")
+        outputs = Parallel(n_jobs=n_jobs)(
+            delayed(_run_fold)(name, estimator, X_mm, y_mm, train_idx, test_idx)
+            for name, estimator in models.items()
+            for train_idx, test_idx in splits
+        )
+        del X_mm, y_mm
+
+    fold_scores = {name: [] for name in models}
+    for name, scores in outputs:
+        fold_scores[name].append(scores)
+
+    results = {}
+    for name, scores in fold_scores.items():
+        summary = {}
+        for metric in METRICS:
+            values = np.array([s[metric] for s in scores])
+            summary[metric] = float(values.mean())
+            summary[f"{metric}_std"] = float(values.std(ddof=1)) if len(values) > 1 else 0.0
+        summary["fold_scores"] = scores
+        results[name] = summary
+    return results
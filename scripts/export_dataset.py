@@ -0,0 +1,375 @@
+"""
+Stream the Excel workbook into compact dataset files for the web app.
+Run from project root: python scripts/export_dataset.py [--compare]
+Requires: Bases_de_datos_Airbnb.xlsx in project root or public/
+Output: lib/airbnb-data.ndjson (one JSON object per row)
+        lib/airbnb-data.col    (columnar binary, format below)
+
+The workbook is read row by row in openpyxl read-only mode; rows are appended to typed
+per-column buffers and never held as Python objects, so memory stays proportional to the
+packed column data.
+
+Columnar format (little-endian):
+  bytes 0-7   magic b"ABNBCOL1"
+  bytes 8-11  uint32 header length H
+  next H      UTF-8 JSON header: { rows, columns: [ { name, type, offset, byteLength, ... } ] }
+  then        column buffers, each starting at an 8-byte aligned file offset, so a JS consumer
+              can wrap any column directly (new Float64Array(buffer, offset, rows)).
+Column types:
+  float64     Float64Array
+  int32       Int32Array
+  dictionary  Uint8Array of codes into the header's "dictionary" list (room_type)
+  utf8        "offsets" Uint32Array (rows + 1) into a UTF-8 byte block at "offset"
+A column with missing cells also has "validity" { offset, byteLength }: Uint8Array, 1 = present.
+Missing values are stored as 0 / empty string in the data buffer itself.
+
+--compare prints file size and parse time against lib/airbnb-data.json (npm run export-data).
+"""
+
+import os
+import sys
+import json
+import gzip
+import time
+import struct
+import argparse
+import datetime
+from array import array
+
+import numpy as np
+from openpyxl import load_workbook
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+EXCEL_PATHS = [
+    os.path.join(PROJECT_ROOT, "Bases_de_datos_Airbnb.xlsx"),
+    os.path.join(PROJECT_ROOT, "public", "Bases_de_datos_Airbnb.xlsx"),
+]
+LIB_DIR = os.path.join(PROJECT_ROOT, "lib")
+JSON_PATH = os.path.join(LIB_DIR, "airbnb-data.json")
+NDJSON_PATH = os.path.join(LIB_DIR, "airbnb-data.ndjson")
+COLUMNAR_PATH = os.path.join(LIB_DIR, "airbnb-data.col")
+
+MAGIC = b"ABNBCOL1"
+# Columns not listed here are exported as utf8, like the string default in scripts/export-data.ts
+COLUMN_TYPES = {
+    "id": "float64",
+    "host_id": "float64",
+    "latitude": "float64",
+    "longitude": "float64",
+    "room_type": "dictionary",
+    "price": "int32",
+    "minimum_nights": "int32",
+    "number_of_reviews": "int32",
+    "reviews_per_month": "float64",
+    "availability_365": "int32",
+    "calculated_host_listings_count": "int32",
+    "name": "utf8",
+    "last_review": "utf8",
+}
+# Columns the analysis pages use; --compare times loading only these
+NUMERIC_COLS = [
+    "price",
+    "minimum_nights",
+    "number_of_reviews",
+    "reviews_per_month",
+    "availability_365",
+    "calculated_host_listings_count",
+]
+
+
+def find_excel():
+    for p in EXCEL_PATHS:
+        if os.path.exists(p):
+            return p
+    raise FileNotFoundError("Bases_de_datos_Airbnb.xlsx not found in project root or public/")
+
+
+class ColumnBuilder:
+    """Append-only typed buffer for one column."""
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.validity = array("B")
+        self.has_nulls = False
+        if kind == "float64":
+            self.data = array("d")
+        elif kind == "int32":
+            self.data = array("i")
+        elif kind == "dictionary":
+            self.data = array("B")
+            self.dictionary = {}
+        else:
+            self.data = bytearray()
+            self.offsets = array("I", [0])
+
+    def append(self, value):
+        """Append a cell; returns the JSON-ready value written to the NDJSON row."""
+        if isinstance(value, str):
+            value = value.strip()
+            if value == "" and self.kind != "utf8":
+                value = None
+        if value is None:
+            self.has_nulls = True
+            self.validity.append(0)
+            self._append_null()
+            return None
+        self.validity.append(1)
+        if self.kind == "float64":
+            value = float(value)
+            self.data.append(value)
+            if value.is_integer():
+                value = int(value)
+        elif self.kind == "int32":
+            value = float(value)
+            if value.is_integer() and -2**31 < value < 2**31:
+                value = int(value)
+                self.data.append(value)
+            else:
+                # A fractional or out-of-range cell widens the column instead of truncating it
+                self.kind = "float64"
+                self.data = array("d", self.data)
+                self.data.append(value)
+        elif self.kind == "dictionary":
+            value = str(value)
+            code = self.dictionary.setdefault(value, len(self.dictionary))
+            if code > 254:
+                raise ValueError(f"Column {self.name} has more than 255 distinct values")
+            self.data.append(code)
+        else:
+            if isinstance(value, datetime.datetime):
+                value = value.date().isoformat() if value.time() == datetime.time() else value.isoformat()
+            elif isinstance(value, datetime.date):
+                value = value.isoformat()
+            else:
+                value = str(value)
+            self.data += value.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return value
+
+    def _append_null(self):
+        if self.kind == "utf8":
+            self.offsets.append(len(self.data))
+        else:
+            self.data.append(0)
+
+    def buffers(self):
+        """Return (header entry without offsets, list of (key, bytes)) for this column."""
+        entry = {"name": self.name, "type": self.kind}
+        parts = []
+        if self.kind == "utf8":
+            parts.append(("offsets", self.offsets.tobytes()))
+            parts.append(("data", bytes(self.data)))
+        else:
+            parts.append(("data", self.data.tobytes()))
+        if self.kind == "dictionary":
+            entry["dictionary"] = list(self.dictionary)
+        if self.has_nulls:
+            parts.append(("validity", self.validity.tobytes()))
+        return entry, parts
+
+
+def _native_little_endian():
+    return sys.byteorder == "little"
+
+
+def write_columnar(path, columns, n_rows):
+    if not _native_little_endian():
+        for col in columns:
+            if col.kind in ("float64", "int32"):
+                col.data.byteswap()
+            elif col.kind == "utf8":
+                col.offsets.byteswap()
+    entries, blobs = [], []
+    for col in columns:
+        entry, parts = col.buffers()
+        entries.append(entry)
+        blobs.append(parts)
+
+    def layout(start):
+        pos = start
+        for entry, parts in zip(entries, blobs):
+            for key, blob in parts:
+                pos = (pos + 7) & ~7
+                if key == "data":
+                    entry["offset"], entry["byteLength"] = pos, len(blob)
+                else:
+                    entry[key] = {"offset": pos, "byteLength": len(blob)}
+                pos += len(blob)
+
+    # Offsets depend on the header length, which depends on the offsets; two passes settle it
+    header = b""
+    for _ in range(3):
+        layout(len(MAGIC) + 4 + len(header))
+        new_header = json.dumps({"rows": n_rows, "columns": entries}, separators=(",", ":")).encode("utf-8")
+        new_header += b" " * ((-(len(MAGIC) + 4 + len(new_header))) % 8)
+        if len(new_header) == len(header):
+            break
+        header = new_header
+    header = new_header
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for entry, parts in zip(entries, blobs):
+            for key, blob in parts:
+                f.write(b"\0" * ((-f.tell()) % 8))
+                f.write(blob)
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a columnar dataset file")
+        (header_len,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(header_len))
+
+
+def column_bytes(path, names):
+    """Raw buffers (data, offsets, validity) of the named columns, i.e. what a reader of them must fetch."""
+    header = read_header(path)
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    out = bytearray()
+    for entry in header["columns"]:
+        if entry["name"] not in names:
+            continue
+        spans = [(entry["offset"], entry["byteLength"])]
+        spans += [(entry[k]["offset"], entry[k]["byteLength"]) for k in ("offsets", "validity") if k in entry]
+        for start, length in spans:
+            out += buf[start:start + length].tobytes()
+    return bytes(out)
+
+
+def read_columns(path, names=None):
+    """
+    Load columns from a columnar file via mmap; only the requested columns are touched.
+    Returns name -> numpy array (NaN for missing floats, None for missing strings).
+    Numeric columns without missing cells are lazy memmap views; np.array() them to read the data.
+    """
+    header = read_header(path)
+    buf = np.memmap(path, dtype=np.uint8, mode="r")
+    n = header["rows"]
+    out = {}
+    for entry in header["columns"]:
+        if names is not None and entry["name"] not in names:
+            continue
+        start, kind = entry["offset"], entry["type"]
+        valid = None
+        if "validity" in entry:
+            v = entry["validity"]
+            valid = buf[v["offset"]:v["offset"] + n].astype(bool)
+        if kind == "utf8":
+            o = entry["offsets"]
+            offsets = buf[o["offset"]:o["offset"] + o["byteLength"]].view("<u4")
+            data = bytes(buf[start:start + entry["byteLength"]])
+            values = np.array(
+                [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(n)], dtype=object
+            )
+            if valid is not None:
+                values[~valid] = None
+        elif kind == "dictionary":
+            codes = buf[start:start + n]
+            values = np.array(entry["dictionary"] + [None], dtype=object)[
+                np.where(valid, codes, len(entry["dictionary"])) if valid is not None else codes
+            ]
+        else:
+            dtype = "<f8" if kind == "float64" else "<i4"
+            values = buf[start:start + entry["byteLength"]].view(dtype)
+            if valid is not None:
+                values = np.where(valid, values, np.nan)
+        out[entry["name"]] = values
+    return out
+
+
+def export(excel_path):
+    os.makedirs(LIB_DIR, exist_ok=True)
+    wb = load_workbook(excel_path, read_only=True, data_only=True)
+    ws = wb.worksheets[0]
+    rows = ws.iter_rows(values_only=True)
+    header = [str(h).strip() if h is not None else f"column_{i}" for i, h in enumerate(next(rows))]
+    columns = [ColumnBuilder(name, COLUMN_TYPES.get(name, "utf8")) for name in header]
+    n_rows = 0
+    with open(NDJSON_PATH, "w", encoding="utf-8") as nd:
+        for row in rows:
+            if row is None or all(cell is None for cell in row):
+                continue
+            record = {}
+            for col, cell in zip(columns, row):
+                record[col.name] = col.append(cell)
+            for col in columns[len(row):]:
+                record[col.name] = col.append(None)
+            nd.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+            nd.write("\n")
+            n_rows += 1
+    wb.close()
+    write_columnar(COLUMNAR_PATH, columns, n_rows)
+    return n_rows
+
+
+def _time(fn, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def _load_json():
+    with open(JSON_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_ndjson():
+    with open(NDJSON_PATH, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def _load_columns(names=None):
+    # Copy every column so the timing includes reading the data, not just mapping the file
+    return {name: np.array(values) for name, values in read_columns(COLUMNAR_PATH, names).items()}
+
+
+def _file_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def compare():
+    rows = []
+    candidates = [
+        ("airbnb-data.json", JSON_PATH, lambda: _file_bytes(JSON_PATH), _load_json),
+        ("airbnb-data.ndjson", NDJSON_PATH, lambda: _file_bytes(NDJSON_PATH), _load_ndjson),
+        ("airbnb-data.col (all columns)", COLUMNAR_PATH, lambda: _file_bytes(COLUMNAR_PATH), _load_columns),
+        # Size of only the buffers these columns occupy, as a ranged or per-column fetch would transfer
+        ("airbnb-data.col (NUMERIC_COLS)", COLUMNAR_PATH, lambda: column_bytes(COLUMNAR_PATH, NUMERIC_COLS),
+         lambda: _load_columns(NUMERIC_COLS)),
+    ]
+    for label, path, payload, loader in candidates:
+        if not os.path.exists(path):
+            print(f"  {label}: not found ({path}); run npm run export-data first" if path == JSON_PATH
+                  else f"  {label}: not found ({path})")
+            continue
+        raw = payload()
+        rows.append((label, len(raw), len(gzip.compress(raw, 6)), _time(loader)))
+    print(f"  {'file':<32}{'size KB':>10}{'gzip KB':>10}{'parse ms':>10}")
+    for label, size, gz, ms in rows:
+        print(f"  {label:<32}{size / 1024:>10.1f}{gz / 1024:>10.1f}{ms:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the workbook to NDJSON and columnar binary.")
+    parser.add_argument("--compare", action="store_true",
+                        help="print size and parse time against lib/airbnb-data.json")
+    args = parser.parse_args()
+
+    excel_path = find_excel()
+    n_rows = export(excel_path)
+    print(f"Exported {n_rows} rows to {NDJSON_PATH} and {COLUMNAR_PATH}")
+    if args.compare:
+        compare()
+
+
+if __name__ == "__main__":
+    main()
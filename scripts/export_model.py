@@ -2,61 +2,88 @@
 Export trained model and artifacts for the web app.
 Run from project root: python scripts/export_model.py
 Requires: Bases_de_datos_Airbnb.xlsx in project root or public/
-Output: model_artifacts/model.joblib, scaler.joblib, label_encoder.json, metrics.json
+Output: model_artifacts/model.joblib, scaler.joblib, label_encoder.json, metrics.json,
+        reference_distributions.json, tree_paths.npz (tree models only)
+Options: --cv K [--repeats R] [--jobs N] selects the model by K-fold (repeated) CV and
+         reports mean and std per metric; charts still use the 80/20 hold-out split.
+         --data PATH trains on another .xlsx/.csv with the workbook's columns.
 """
 
 import os
 import sys
 import json
+import argparse
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import LabelEncoder, StandardScaler
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
 from sklearn.linear_model import LinearRegression
-from sklearn.metrics import mean_squared_error, r2_score, mean_absolute_error
 import joblib
 
+from cross_validation import add_cv_arguments, check_cv_arguments, cross_validate_models, score_predictions, METRICS
+
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+from _treeshap import tree_paths, tree_shap, save_paths, max_rows  # noqa: E402
+
 EXCEL_PATHS = [
     os.path.join(PROJECT_ROOT, "Bases_de_datos_Airbnb.xlsx"),
     os.path.join(PROJECT_ROOT, "public", "Bases_de_datos_Airbnb.xlsx"),
 ]
 OUT_DIR = os.path.join(PROJECT_ROOT, "model_artifacts")
+REFERENCE_BINS = 10
+SHAP_SUMMARY_ROWS = 2000
+# Leaf-row visits the global TreeSHAP summary may spend (see api/_treeshap.py)
+SHAP_SUMMARY_LEAF_ROWS = 20_000_000
+
+
+def reference_histogram(values, bins=REFERENCE_BINS):
+    """
+    Bin values for drift monitoring. Edges are interior cut points (quantiles, or midpoints
+    between distinct values for discrete features); bin i holds edges[i-1] <= x < edges[i],
+    with open-ended first and last bins, matching np.searchsorted(edges, x, side="right").
+    """
+    values = np.asarray(values, dtype=float)
+    distinct = np.unique(values)
+    if len(distinct) <= bins:
+        edges = (distinct[:-1] + distinct[1:]) / 2
+    else:
+        edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)[1:-1]))
+        edges = edges[edges > distinct[0]]
+    counts = np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    return {"edges": [float(e) for e in edges], "counts": [int(c) for c in counts]}
 
 
-def load_data():
+def load_data(path=None):
+    if path:
+        return pd.read_csv(path) if path.lower().endswith(".csv") else pd.read_excel(path)
     for p in EXCEL_PATHS:
         if os.path.exists(p):
             return pd.read_excel(p)
     raise FileNotFoundError("Bases_de_datos_Airbnb.xlsx not found in project root or public/")
 
 
-def main():
-    os.makedirs(OUT_DIR, exist_ok=True)
-
-    df = load_data()
-    df_ml = df.copy()
+def encode_features(df, le):
+    """Drop non-predictive columns and encode room_type with a fitted encoder. Row-wise, so it also works per chunk."""
     columns_to_drop = ["name", "latitude", "longitude", "id", "host_id", "last_review"]
-    df_ml.drop(columns=[c for c in columns_to_drop if c in df_ml.columns], axis=1, inplace=True)
-    df_ml["reviews_per_month"].fillna(0, inplace=True)
-
-    le = LabelEncoder()
-    df_ml["room_type_encoded"] = le.fit_transform(df_ml["room_type"].astype(str))
+    df_ml = df.drop(columns=[c for c in columns_to_drop if c in df.columns])
+    df_ml["reviews_per_month"] = df_ml["reviews_per_month"].fillna(0)
+    df_ml["room_type_encoded"] = le.transform(df_ml["room_type"].astype(str))
     df_ml = df_ml.drop("room_type", axis=1)
+    return df_ml.drop("price", axis=1), df_ml["price"]
 
-    price_99 = df_ml["price"].quantile(0.99)
-    df_ml_clean = df_ml[df_ml["price"] <= price_99].copy()
 
-    X = df_ml_clean.drop("price", axis=1)
-    y = df_ml_clean["price"]
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+def prepare_features(df):
+    """Drop non-predictive columns, encode room_type and trim price outliers. Returns X, y, encoder."""
+    le = LabelEncoder().fit(df["room_type"].astype(str))
+    X, y = encode_features(df, le)
+    keep = y <= y.quantile(0.99)
+    return X[keep].copy(), y[keep].copy(), le
 
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
 
-    models = {
+def build_models():
+    return {
         "Random Forest": RandomForestRegressor(
             n_estimators=100, max_depth=15, min_samples_split=5, random_state=42
         ),
@@ -66,23 +93,45 @@ def main():
         "Linear Regression": LinearRegression(),
     }
 
+
+def main():
+    parser = argparse.ArgumentParser(description="Train candidate models and export artifacts.")
+    add_cv_arguments(parser)
+    parser.add_argument("--data", metavar="PATH",
+                        help="train on this .xlsx/.csv (e.g. from scripts/synthetic_data.py) instead of the workbook")
+    args = parser.parse_args()
+    check_cv_arguments(parser, args)
+    os.makedirs(OUT_DIR, exist_ok=True)
+
+    df = load_data(args.data)
+    X, y, le = prepare_features(df)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    models = build_models()
+
     results = {}
     for name, model in models.items():
         model.fit(X_train_scaled, y_train)
         y_pred = model.predict(X_test_scaled)
-        r2 = r2_score(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
-        mae = mean_absolute_error(y_test, y_pred)
-        mape = np.mean(np.abs((y_test - y_pred) / (y_test + 1e-8))) * 100
         results[name] = {
             "model": model,
             "predictions": y_pred,
-            "r2": float(r2),
-            "rmse": float(rmse),
-            "mae": float(mae),
-            "mape": float(mape),
+            **score_predictions(y_test, y_pred),
         }
 
+    evaluation = {"method": "holdout", "testSize": 0.2}
+    if args.cv:
+        cv_results = cross_validate_models(
+            build_models(), X.values, y.values, folds=args.cv, repeats=args.repeats, n_jobs=args.jobs
+        )
+        for name in results:
+            results[name].update({k: v for k, v in cv_results[name].items() if k != "fold_scores"})
+        evaluation = {"method": "cv", "folds": args.cv, "repeats": args.repeats}
+
     best_name = max(results, key=lambda k: results[k]["r2"])
     best_model = results[best_name]["model"]
     best_r2 = results[best_name]["r2"]
@@ -106,12 +155,37 @@ def main():
     with open(os.path.join(OUT_DIR, "label_encoder.json"), "w", encoding="utf-8") as f:
         json.dump(label_mapping, f, indent=0)
 
+    reference = {
+        "bins": REFERENCE_BINS,
+        "n": int(len(X_train)),
+        "features": {col: reference_histogram(X_train[col]) for col in X.columns},
+        "prediction": reference_histogram(best_model.predict(X_train_scaled)),
+    }
+    with open(os.path.join(OUT_DIR, "reference_distributions.json"), "w", encoding="utf-8") as f:
+        json.dump(reference, f, indent=2)
+
     feature_importance = []
     if hasattr(best_model, "feature_importances_"):
         for feat, imp in zip(X.columns, best_model.feature_importances_):
             feature_importance.append({"variable": feat, "importancia": float(imp)})
         feature_importance.sort(key=lambda x: x["importancia"], reverse=True)
 
+    # Global TreeSHAP summary over the hold-out rows; the same arrays serve /api/predict explain
+    shap_importance = []
+    shap_base_value = None
+    shap_summary_rows = 0
+    paths = tree_paths(best_model)
+    tree_paths_file = os.path.join(OUT_DIR, "tree_paths.npz")
+    if paths is not None:
+        save_paths(paths, tree_paths_file)
+        shap_summary_rows = min(SHAP_SUMMARY_ROWS, max_rows(paths, SHAP_SUMMARY_LEAF_ROWS), len(X_test_scaled))
+        shap_base_value, phi = tree_shap(paths, X_test_scaled[:shap_summary_rows])
+        for feat, mean_abs, mean in zip(X.columns, np.abs(phi).mean(axis=0), phi.mean(axis=0)):
+            shap_importance.append({"variable": feat, "meanAbsShap": float(mean_abs), "meanShap": float(mean)})
+        shap_importance.sort(key=lambda x: x["meanAbsShap"], reverse=True)
+    elif os.path.exists(tree_paths_file):
+        os.remove(tree_paths_file)
+
     predictions_vs_real = [
         {"real": float(y_test.iloc[i]), "pred": float(y_pred_best[i])}
         for i in range(min(500, len(y_test)))
@@ -133,27 +207,45 @@ def main():
         "mae": best_mae,
         "mape": best_mape,
         "reliability": reliability,
+        "evaluation": evaluation,
         "models": [
             {
                 "name": name,
-                "r2": results[name]["r2"],
-                "rmse": results[name]["rmse"],
-                "mae": results[name]["mae"],
-                "mape": results[name]["mape"],
+                **{metric: results[name][metric] for metric in METRICS},
+                **{
+                    f"{metric}Std": results[name][f"{metric}_std"]
+                    for metric in METRICS
+                    if f"{metric}_std" in results[name]
+                },
             }
             for name in results
         ],
         "featureImportance": feature_importance,
+        "shapImportance": shap_importance,
+        "shapBaseValue": shap_base_value,
+        "shapSummaryRows": shap_summary_rows,
         "predictionsVsReal": predictions_vs_real,
         "residuals": residuals_data,
         "errorsHistogram": errors_histogram,
     }
+    if evaluation["method"] == "cv":
+        for metric in METRICS:
+            metrics[f"{metric}Std"] = results[best_name][f"{metric}_std"]
 
     with open(os.path.join(OUT_DIR, "metrics.json"), "w", encoding="utf-8") as f:
         json.dump(metrics, f, indent=2)
 
     print(f"Exported best model: {best_name} to {OUT_DIR}")
-    print(f"  R2={best_r2:.4f}, RMSE={best_rmse:.2f}, MAE={best_mae:.2f}, MAPE={best_mape:.2f}%")
+    if evaluation["method"] == "cv":
+        print(f"  {args.cv}-fold CV x{args.repeats}, mean ± std:")
+        for name in results:
+            r = results[name]
+            print(
+                f"  {name}: R2={r['r2']:.4f}±{r['r2_std']:.4f}, RMSE={r['rmse']:.2f}±{r['rmse_std']:.2f}, "
+                f"MAE={r['mae']:.2f}±{r['mae_std']:.2f}, MAPE={r['mape']:.2f}±{r['mape_std']:.2f}%"
+            )
+    else:
+        print(f"  R2={best_r2:.4f}, RMSE={best_rmse:.2f}, MAE={best_mae:.2f}, MAPE={best_mape:.2f}%")
 
 
 if __name__ == "__main__":
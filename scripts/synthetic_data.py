@@ -0,0 +1,188 @@
+"""
+Synthetic Airbnb listings fitted to the real workbook, for scaling tests.
+Run from project root: python scripts/synthetic_data.py --rows 1000000 --out synthetic_1m.csv
+Requires: Bases_de_datos_Airbnb.xlsx in project root or public/
+Output: CSV (any size, written in chunks) or .xlsx (up to 1,048,575 rows) with the workbook's columns,
+        usable as python scripts/export_model.py --data PATH
+
+Model: room_type is drawn from the real mix, then whether the listing has reviews (in the real
+data reviews_per_month and last_review are missing exactly when number_of_reviews is 0). Within
+each (room_type, has_reviews) group a Gaussian copula couples the numeric columns: normal-score
+correlations capture the joint structure (e.g. reviews vs availability), and each column is mapped
+back through its empirical quantiles, so skew (price) and discreteness (counts) are preserved.
+Groups too small for a stable correlation fall back to the pooled has_reviews correlation.
+id and name are sequential placeholders; host_id is random and not tied to
+calculated_host_listings_count.
+"""
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.stats import norm, rankdata
+
+from export_model import load_data
+
+COPULA_COLUMNS = [
+    "price",
+    "minimum_nights",
+    "number_of_reviews",
+    "reviews_per_month",
+    "last_review",
+    "calculated_host_listings_count",
+    "availability_365",
+    "latitude",
+    "longitude",
+]
+REVIEW_COLUMNS = ["number_of_reviews", "reviews_per_month", "last_review"]
+OUTPUT_COLUMNS = [
+    "id",
+    "name",
+    "host_id",
+    "latitude",
+    "longitude",
+    "room_type",
+    "price",
+    "minimum_nights",
+    "number_of_reviews",
+    "last_review",
+    "reviews_per_month",
+    "calculated_host_listings_count",
+    "availability_365",
+]
+QUANTILE_POINTS = 1001
+MIN_CORR_ROWS = 50
+XLSX_MAX_ROWS = 1_048_575
+EPOCH = pd.Timestamp("1970-01-01")
+
+
+def _group_columns(has_reviews):
+    return COPULA_COLUMNS if has_reviews else [c for c in COPULA_COLUMNS if c not in REVIEW_COLUMNS]
+
+
+def _normal_scores(values):
+    return norm.ppf(rankdata(values, method="average") / (len(values) + 1))
+
+
+def _correlation(frame, columns):
+    Z = np.column_stack([_normal_scores(frame[c].values) for c in columns])
+    corr = np.corrcoef(Z, rowvar=False)
+    corr = np.nan_to_num(corr, nan=0.0)
+    np.fill_diagonal(corr, 1.0)
+    # Clip to the nearest positive definite matrix so the Cholesky factor exists
+    w, V = np.linalg.eigh(corr)
+    corr = (V * np.maximum(w, 1e-6)) @ V.T
+    d = np.sqrt(np.diag(corr))
+    return corr / np.outer(d, d)
+
+
+def fit(df):
+    """Fit the generator to a workbook DataFrame. Returns a dict of group quantiles and copula factors."""
+    df = df.copy()
+    df["room_type"] = df["room_type"].astype(str)
+    df["last_review"] = (pd.to_datetime(df["last_review"]) - EPOCH).dt.days
+    has_reviews = df["number_of_reviews"] > 0
+
+    shares = df["room_type"].value_counts(normalize=True)
+    params = {
+        "room_types": list(shares.index),
+        "room_type_p": shares.values.tolist(),
+        "dtypes": {c: str(df[c].dtype) for c in COPULA_COLUMNS if c != "last_review"},
+        "groups": {},
+    }
+    pooled_corr = {hr: _correlation(df[has_reviews == hr], _group_columns(hr)) for hr in (False, True)}
+    probs = np.linspace(0, 1, QUANTILE_POINTS)
+    for rt in params["room_types"]:
+        in_rt = df["room_type"] == rt
+        params["groups"][rt] = {"p_reviews": float(has_reviews[in_rt].mean())}
+        for hr in (False, True):
+            group = df[in_rt & (has_reviews == hr)]
+            if len(group) == 0:
+                continue
+            columns = _group_columns(hr)
+            params["groups"][rt][hr] = {
+                "columns": columns,
+                "quantiles": {
+                    c: np.quantile(group[c].values.astype(float), probs, method="inverted_cdf") for c in columns
+                },
+                "chol": np.linalg.cholesky(
+                    _correlation(group, columns) if len(group) >= MIN_CORR_ROWS else pooled_corr[hr]
+                ),
+            }
+    return params
+
+
+def _sample_group(spec, n, rng):
+    Z = rng.standard_normal((n, len(spec["columns"]))) @ spec["chol"].T
+    idx = np.minimum((norm.cdf(Z) * QUANTILE_POINTS).astype(int), QUANTILE_POINTS - 1)
+    return {c: spec["quantiles"][c][idx[:, j]] for j, c in enumerate(spec["columns"])}
+
+
+def generate(params, n_rows, chunk_size=100_000, seed=0, start_id=1):
+    """Yield DataFrames of at most chunk_size synthetic listings until n_rows are produced."""
+    rng = np.random.default_rng(seed)
+    next_id = start_id
+    room_types = np.array(params["room_types"], dtype=object)
+    while n_rows > 0:
+        n = min(chunk_size, n_rows)
+        rt_idx = rng.choice(len(room_types), size=n, p=params["room_type_p"])
+        p_reviews = np.array([params["groups"][rt]["p_reviews"] for rt in room_types])[rt_idx]
+        has_reviews = rng.random(n) < p_reviews
+        cols = {c: np.full(n, np.nan) for c in COPULA_COLUMNS}
+        cols["number_of_reviews"][:] = 0
+        for i, rt in enumerate(room_types):
+            for hr in (False, True):
+                mask = (rt_idx == i) & (has_reviews == hr)
+                k = int(mask.sum())
+                if k == 0:
+                    continue
+                # A group unseen in the data (e.g. no reviewed rooms of a type) borrows the other one
+                spec = params["groups"][rt].get(hr) or params["groups"][rt].get(not hr)
+                for c, values in _sample_group(spec, k, rng).items():
+                    if hr or c not in REVIEW_COLUMNS:
+                        cols[c][mask] = values
+
+        ids = np.arange(next_id, next_id + n)
+        next_id += n
+        chunk = pd.DataFrame({
+            "id": ids,
+            "name": [f"Synthetic listing {i}" for i in ids],
+            "host_id": rng.integers(1, 400_000_000, size=n),
+            "room_type": room_types[rt_idx],
+        })
+        for c, values in cols.items():
+            if c == "last_review":
+                chunk[c] = pd.to_datetime(values, unit="D")
+            elif params["dtypes"][c].startswith("int") and not np.isnan(values).any():
+                chunk[c] = values.astype(params["dtypes"][c])
+            else:
+                chunk[c] = values
+        yield chunk[OUTPUT_COLUMNS]
+        n_rows -= n
+
+
+def write(params, n_rows, out_path, chunk_size=100_000, seed=0):
+    if out_path.lower().endswith(".xlsx"):
+        if n_rows > XLSX_MAX_ROWS:
+            raise ValueError(f"xlsx holds at most {XLSX_MAX_ROWS} rows; use a .csv output")
+        pd.concat(generate(params, n_rows, chunk_size, seed), ignore_index=True).to_excel(out_path, index=False)
+        return
+    for i, chunk in enumerate(generate(params, n_rows, chunk_size, seed)):
+        chunk.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False, date_format="%Y-%m-%d")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic listings fitted to the workbook.")
+    parser.add_argument("--rows", type=int, required=True, help="number of listings to generate")
+    parser.add_argument("--out", required=True, help="output .csv (chunked) or .xlsx path")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows per generated chunk")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    params = fit(load_data())
+    write(params, args.rows, args.out, args.chunk_size, args.seed)
+    print(f"Wrote {args.rows} synthetic listings to {os.path.abspath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+import predict  # noqa: E402
+
+
+class _Request(predict.handler):
+    """predict.handler without a socket: reads the body from bytes and captures the response."""
+
+    def __init__(self, method, body):
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+        self.headers = {"Content-Length": str(len(body))}
+        self.command, self.path, self.request_version = method, "/api/predict", "HTTP/1.1"
+        self.requestline = f"{method} /api/predict HTTP/1.1"
+        self.client_address = ("127.0.0.1", 0)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def call_handler():
+    """Run one GET/POST through predict.handler; returns (status, headers, decoded JSON body)."""
+
+    def call(method, body=b""):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+        request = _Request(method, body)
+        getattr(request, f"do_{method}")()
+        head, _, payload = request.wfile.getvalue().partition(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        headers = dict(line.split(": ", 1) for line in lines[1:])
+        return int(lines[0].split()[1]), headers, json.loads(payload)
+
+    return call
@@ -0,0 +1,34 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts"))
+from cross_validation import add_cv_arguments, check_cv_arguments, score_predictions  # noqa: E402
+
+
+def _parse(argv):
+    parser = argparse.ArgumentParser()
+    add_cv_arguments(parser)
+    args = parser.parse_args(argv)
+    check_cv_arguments(parser, args)
+    return args
+
+
+@pytest.mark.parametrize("argv", [[], ["--cv", "0"], ["--cv", "2"], ["--cv", "5", "--repeats", "3", "--jobs", "2"]])
+def test_valid_cv_arguments(argv):
+    _parse(argv)
+
+
+@pytest.mark.parametrize("argv", [["--cv", "1"], ["--cv", "-2"], ["--cv", "5", "--repeats", "0"], ["--jobs", "0"]])
+def test_invalid_cv_arguments_exit(argv):
+    with pytest.raises(SystemExit):
+        _parse(argv)
+
+
+def test_mape_leaves_out_zero_prices():
+    scores = score_predictions([0, 100, 200], [50, 110, 180])
+    assert scores["mape"] == pytest.approx(10.0)
+    assert scores["mae"] == pytest.approx(np.mean([50, 10, 20]))
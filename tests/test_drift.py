@@ -0,0 +1,137 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts"))
+import predict  # noqa: E402
+from export_model import reference_histogram  # noqa: E402
+
+
+def _training_frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "minimum_nights": rng.integers(1, 8, n),
+        "number_of_reviews": rng.poisson(20, n),
+        "reviews_per_month": rng.gamma(2.0, 0.5, n),
+        "calculated_host_listings_count": rng.integers(1, 4, n),
+        "availability_365": rng.integers(0, 366, n),
+        "room_type_encoded": rng.integers(0, 4, n),
+    })[predict.FEATURE_ORDER]
+
+
+def _predictions(X):
+    return np.asarray(X, dtype=float).sum(axis=1)
+
+
+@pytest.fixture
+def train():
+    return _training_frame()
+
+
+@pytest.fixture
+def reference(train, tmp_path, monkeypatch):
+    """Write reference_distributions.json like export_model.py and load it with fresh live counters."""
+    ref = {
+        "features": {col: reference_histogram(train[col]) for col in train.columns},
+        "prediction": reference_histogram(_predictions(train)),
+    }
+    with open(tmp_path / "reference_distributions.json", "w", encoding="utf-8") as f:
+        json.dump(ref, f)
+    monkeypatch.setattr(predict, "MODEL_DIR", str(tmp_path))
+    loaded = predict.load_reference()
+    monkeypatch.setattr(predict, "REFERENCE", loaded)
+    live = {name: np.zeros(len(h["expected"]), dtype=np.int64) for name, h in loaded.items()}
+    monkeypatch.setattr(predict, "LIVE_COUNTS", live)
+    monkeypatch.setattr(predict, "DRIFT_STATE", {"observations": 0, "last_eval": 0, "scores": None})
+    return loaded
+
+
+def _record(X):
+    X = np.asarray(X, dtype=float)
+    predict.record_observations(X, _predictions(X))
+
+
+def test_discrete_feature_gets_one_bin_per_value():
+    h = reference_histogram([1, 1, 2, 3, 3, 3])
+    assert h == {"edges": [1.5, 2.5], "counts": [2, 1, 3]}
+
+
+def test_quantile_bins_follow_searchsorted_right():
+    values = np.arange(1000)
+    h = reference_histogram(values, bins=10)
+    assert len(h["edges"]) == 9 and h["counts"] == [100] * 10
+    # A value equal to an edge belongs to the bin above it: edges[i-1] <= x < edges[i]
+    edge = h["edges"][0]
+    assert np.searchsorted(h["edges"], edge, side="right") == 1
+    assert np.searchsorted(h["edges"], np.nextafter(edge, -np.inf), side="right") == 0
+
+
+def test_quantile_bins_merge_ties_and_keep_a_nonempty_first_bin():
+    values = np.r_[np.zeros(900), np.linspace(1, 100, 100)]
+    h = reference_histogram(values, bins=10)
+    assert h["edges"] == sorted(set(h["edges"])) and h["edges"][0] > 0
+    assert h["counts"][0] == 900 and sum(h["counts"]) == len(values)
+
+
+def test_live_counts_keep_their_shape(reference, train):
+    shapes = {k: v.shape for k, v in predict.LIVE_COUNTS.items()}
+    for _ in range(5):
+        _record(train.values)
+    _record(train.values * 1000 - 1e6)  # far outside every reference bin
+    assert {k: v.shape for k, v in predict.LIVE_COUNTS.items()} == shapes
+    assert all(v.sum() == predict.DRIFT_STATE["observations"] for v in predict.LIVE_COUNTS.values())
+
+
+def test_same_distribution_is_stable(reference):
+    _record(_training_frame(seed=1).values)
+    report = predict.drift_report()
+    assert report["status"] == "stable" and not report["retrain_recommended"]
+    assert report["max_psi"] < 0.01
+    assert all(s["ks"] < 0.05 for s in report["scores"].values())
+
+
+def test_identical_distribution_scores_zero(reference, train):
+    _record(train.values)
+    scores = predict.drift_report()["scores"]
+    assert all(s["psi"] == pytest.approx(0, abs=1e-4) for s in scores.values())
+    assert all(s["ks"] == pytest.approx(0, abs=1e-4) for s in scores.values())
+
+
+def test_shifted_distribution_is_significant(reference):
+    shifted = _training_frame(seed=1)
+    shifted["availability_365"] = 365
+    shifted["minimum_nights"] += 30
+    _record(shifted.values)
+    report = predict.drift_report()
+    assert report["status"] == "significant" and report["retrain_recommended"]
+    assert report["scores"]["availability_365"]["ks"] > 0.5
+
+
+def test_too_few_observations_are_insufficient(reference):
+    shifted = _training_frame(n=predict.DRIFT_MIN_OBSERVATIONS - 1, seed=1) + 100
+    _record(shifted.values)
+    report = predict.drift_report()
+    assert report["observations"] == predict.DRIFT_MIN_OBSERVATIONS - 1
+    assert report["status"] == "insufficient_data"
+    _record(shifted.values[:1])
+    assert predict.drift_report()["status"] == "significant"
+
+
+def test_get_without_reference_is_404(tmp_path, monkeypatch, call_handler):
+    monkeypatch.setattr(predict, "MODEL_DIR", str(tmp_path))
+    monkeypatch.setattr(predict, "REFERENCE", predict.load_reference())
+    status, headers, body = call_handler("GET")
+    assert status == 404 and "error" in body
+    assert headers["Access-Control-Allow-Origin"] == "*"
+
+
+def test_get_returns_the_report(reference, train, call_handler):
+    _record(train.values)
+    status, _, body = call_handler("GET")
+    assert status == 200 and body["observations"] == len(train)
@@ -0,0 +1,182 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "api"))
+sys.path.insert(0, os.path.join(PROJECT_ROOT, "scripts"))
+import predict  # noqa: E402
+from export_model import prepare_features  # noqa: E402
+
+LABELS = {"Entire home/apt": 0, "Hotel room": 1, "Private room": 2, "Shared room": 3}
+HUGE_INT = 10 ** 400
+
+
+class _Identity:
+    def transform(self, X):
+        return X
+
+
+class _SumModel:
+    def predict(self, X):
+        return X.sum(axis=1)
+
+
+@pytest.fixture(autouse=True)
+def artifacts(monkeypatch):
+    monkeypatch.setattr(predict, "LABEL_ENCODER", LABELS)
+    monkeypatch.setattr(predict, "MODEL", _SumModel())
+    monkeypatch.setattr(predict, "SCALER", _Identity())
+    monkeypatch.setattr(predict, "MAE", 10.0)
+    monkeypatch.setattr(predict, "REFERENCE", None)
+    monkeypatch.setattr(predict, "TREE_PATHS", None)
+
+
+def test_feature_order_matches_training_columns():
+    # The scaler and model see columns positionally, so serving must use prepare_features' order
+    df = pd.DataFrame({
+        "id": [1, 2],
+        "name": ["a", "b"],
+        "host_id": [10, 20],
+        "latitude": [40.4, 40.5],
+        "longitude": [-3.7, -3.6],
+        "room_type": ["Private room", "Entire home/apt"],
+        "price": [50, 80],
+        "minimum_nights": [1, 3],
+        "number_of_reviews": [0, 12],
+        "last_review": [None, "2023-05-01"],
+        "reviews_per_month": [None, 0.8],
+        "calculated_host_listings_count": [1, 2],
+        "availability_365": [100, 365],
+    })
+    X, _, _ = prepare_features(df)
+    assert predict.FEATURE_ORDER == list(X.columns)
+
+
+def test_defaults_fill_missing_fields():
+    X, errors = predict.validate_rows([{}])
+    assert errors == {}
+    row = dict(zip(predict.FEATURE_ORDER, X[0]))
+    assert row["minimum_nights"] == 1
+    assert row["availability_365"] == 365
+    assert row["room_type_encoded"] == LABELS["Entire home/apt"]
+
+
+def test_numeric_strings_are_coerced():
+    X, errors = predict.validate_rows([{"minimum_nights": "3", "reviews_per_month": "0.5"}])
+    assert errors == {}
+    assert X[0, predict.FEATURE_ORDER.index("minimum_nights")] == 3
+    assert X[0, predict.FEATURE_ORDER.index("reviews_per_month")] == 0.5
+
+
+@pytest.mark.parametrize("value", [True, False, None, "abc", "", [1], {"a": 1}])
+def test_non_numeric_values_are_rejected(value):
+    _, errors = predict.validate_rows([{"number_of_reviews": value}])
+    assert errors == {0: {"number_of_reviews": "must be a finite number"}}
+
+
+@pytest.mark.parametrize("value", [float("inf"), float("-inf"), float("nan"), "inf", "nan", "1e400", HUGE_INT])
+def test_non_finite_and_overflowing_values_are_rejected(value):
+    _, errors = predict.validate_rows([{"minimum_nights": value}])
+    assert errors == {0: {"minimum_nights": "must be a finite number"}}
+
+
+def test_range_checks():
+    _, errors = predict.validate_rows([
+        {"availability_365": 366},
+        {"availability_365": -1, "number_of_reviews": -2},
+        {"availability_365": 0},
+    ])
+    assert errors == {
+        0: {"availability_365": "must be <= 365"},
+        1: {"availability_365": "must be >= 0", "number_of_reviews": "must be >= 0"},
+    }
+
+
+@pytest.mark.parametrize("room_type", ["Castle", "", 1, None])
+def test_unknown_room_type_is_rejected(room_type):
+    _, errors = predict.validate_rows([{"room_type": room_type}])
+    assert list(errors[0]) == ["room_type"]
+    assert errors[0]["room_type"].startswith("must be one of:")
+
+
+def test_non_object_batch_rows_are_rejected():
+    _, errors = predict.validate_rows([{}, 5, "row", None, [1, 2]])
+    assert sorted(errors) == [1, 2, 3, 4]
+    assert all(errors[i] == {"_row": "expected a JSON object"} for i in (1, 2, 3, 4))
+
+
+def test_single_invalid_payload_returns_field_errors():
+    result = predict.predict({"minimum_nights": HUGE_INT, "room_type": "Castle"})
+    assert result["error"] == "Invalid input."
+    assert set(result["fields"]) == {"minimum_nights", "room_type"}
+
+
+def test_batch_isolates_invalid_rows():
+    result = predict.predict({"instances": [{"minimum_nights": 2}, {"minimum_nights": HUGE_INT}, 7]})
+    assert result["predictions"][0]["predicted_price"] == pytest.approx(
+        2 + 0 + 0 + 1 + 365 + LABELS["Entire home/apt"]
+    )
+    assert result["predictions"][1] is None and result["predictions"][2] is None
+    assert [e["index"] for e in result["errors"]] == [1, 2]
+
+
+def test_batch_shape_errors():
+    assert "error" in predict.predict({"instances": []})
+    assert "error" in predict.predict({"instances": {"a": 1}})
+    assert "error" in predict.predict({"instances": [{}] * (predict.MAX_BATCH_SIZE + 1)})
+    assert "error" in predict.predict([{}])
+
+
+def test_coerce_column_masks_only_bad_entries():
+    values, invalid = predict._coerce_column([1, "2", HUGE_INT, None, True, 3.5])
+    assert invalid.tolist() == [False, False, True, True, True, False]
+    assert np.array_equal(values[~invalid], [1.0, 2.0, 3.5])
+
+
+@pytest.mark.parametrize("value", ["false", "true", 1, 0, None, [], {}])
+def test_explain_must_be_a_boolean(value):
+    assert predict.predict({"explain": value}) == {"error": "explain must be a JSON boolean."}
+    assert predict.predict({"instances": [{}], "explain": value}) == {"error": "explain must be a JSON boolean."}
+
+
+def test_explain_false_is_a_plain_prediction():
+    assert "explanation" not in predict.predict({"explain": False})
+
+
+def test_explain_batch_limit_shrinks_for_large_forests(monkeypatch):
+    n_leaves = predict.MAX_EXPLAIN_LEAF_ROWS // 10
+    monkeypatch.setattr(predict, "TREE_PATHS", {"v": np.zeros(n_leaves)})
+    assert predict.explain_limit() == 10
+    result = predict.predict({"instances": [{}] * 11, "explain": True})
+    assert result == {"error": "explain supports at most 10 instances per request for this model."}
+
+
+def test_unsupported_explain_fails_before_predicting(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(predict, "record_observations", lambda X, preds: recorded.append(len(X)))
+    assert predict.predict({"instances": [{}], "explain": True}) == {
+        "error": "Explanations are not available for _SumModel."
+    }
+    assert recorded == []
+    predict.predict({"instances": [{}, {}]})
+    assert recorded == [2]
+
+
+@pytest.mark.parametrize("raw, message", [
+    (b'{"minimum_nights": ', "Invalid JSON"),
+    (b'{"room_type": "\xff"}', "Body must be UTF-8"),
+])
+def test_malformed_body_is_a_400_with_cors(call_handler, raw, message):
+    status, headers, body = call_handler("POST", raw)
+    assert status == 400 and body["error"].startswith(message)
+    assert headers["Access-Control-Allow-Origin"] == "*"
+
+
+def test_post_round_trip(call_handler):
+    status, headers, body = call_handler("POST", {"minimum_nights": 2})
+    assert status == 200 and headers["Access-Control-Allow-Origin"] == "*"
+    assert set(body) == {"predicted_price", "interval_low", "interval_high", "mae"}
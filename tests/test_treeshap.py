@@ -0,0 +1,127 @@
+import itertools
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "api"))
+import _treeshap  # noqa: E402
+import predict  # noqa: E402
+
+N_FEATURES = 4
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.standard_normal((300, N_FEATURES))
+    y = 3 * X[:, 0] + X[:, 1] * X[:, 2] + np.where(X[:, 3] > 0, 2.0, -1.0) + 0.1 * rng.standard_normal(300)
+    return X, y
+
+
+MODELS = {
+    "tree": lambda: DecisionTreeRegressor(max_depth=5, random_state=0),
+    "gb": lambda: GradientBoostingRegressor(n_estimators=20, max_depth=3, random_state=0),
+    "rf": lambda: RandomForestRegressor(n_estimators=5, max_depth=6, random_state=0),
+}
+
+
+def _trees(model):
+    trees, weight = _treeshap._tree_estimators(model)
+    return [est.tree_ for est in trees], weight
+
+
+def _conditional_expectation(tree, x, subset, node=0):
+    """E[tree(x) | x_S] with path-dependent conditioning: features outside S follow the training cover."""
+    left, right = tree.children_left[node], tree.children_right[node]
+    if left == -1:
+        return tree.value[node, 0, 0]
+    f = tree.feature[node]
+    if f in subset:
+        child = left if np.float32(x[f]) <= tree.threshold[node] else right
+        return _conditional_expectation(tree, x, subset, child)
+    cover = tree.weighted_n_node_samples
+    return (
+        cover[left] * _conditional_expectation(tree, x, subset, left)
+        + cover[right] * _conditional_expectation(tree, x, subset, right)
+    ) / cover[node]
+
+
+def _brute_force_shap(model, x):
+    trees, weight = _trees(model)
+    m = len(x)
+
+    def value(subset):
+        return weight * sum(_conditional_expectation(t, x, subset) for t in trees)
+
+    phi = np.zeros(m)
+    for i in range(m):
+        others = [j for j in range(m) if j != i]
+        for k in range(m):
+            w = math.factorial(k) * math.factorial(m - k - 1) / math.factorial(m)
+            for subset in itertools.combinations(others, k):
+                phi[i] += w * (value(set(subset) | {i}) - value(set(subset)))
+    return phi
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_attributions_add_up_to_the_prediction(data, name):
+    X, y = data
+    model = MODELS[name]().fit(X, y)
+    paths = _treeshap.tree_paths(model)
+    base, phi = _treeshap.tree_shap(paths, X[:50])
+    assert phi.shape == (50, N_FEATURES)
+    np.testing.assert_allclose(base + phi.sum(axis=1), model.predict(X[:50]), rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_attributions_match_brute_force_shapley_values(data, name):
+    X, y = data
+    model = MODELS[name]().fit(X, y)
+    paths = _treeshap.tree_paths(model)
+    _, phi = _treeshap.tree_shap(paths, X[:1])
+    np.testing.assert_allclose(phi[0], _brute_force_shap(model, X[0]), rtol=0, atol=1e-10)
+
+
+def test_base_value_is_the_empty_coalition(data):
+    X, y = data
+    model = MODELS["gb"]().fit(X, y)
+    paths = _treeshap.tree_paths(model)
+    trees, weight = _trees(model)
+    expected = model.init_.constant_[0, 0] + weight * sum(_conditional_expectation(t, X[0], set()) for t in trees)
+    assert _treeshap.base_value(paths) == pytest.approx(expected, abs=1e-10)
+
+
+def test_saved_paths_round_trip(data, tmp_path):
+    X, y = data
+    paths = _treeshap.tree_paths(MODELS["tree"]().fit(X, y))
+    _treeshap.save_paths(paths, tmp_path / "tree_paths.npz")
+    loaded = _treeshap.load_paths(tmp_path / "tree_paths.npz")
+    np.testing.assert_array_equal(_treeshap.tree_shap(loaded, X[:5])[1], _treeshap.tree_shap(paths, X[:5])[1])
+
+
+def test_non_tree_models_have_no_paths(data):
+    X, y = data
+    assert _treeshap.tree_paths(LinearRegression().fit(X, y)) is None
+
+
+def test_max_rows_spends_the_leaf_budget():
+    paths = {"v": np.zeros(1000)}
+    assert _treeshap.max_rows(paths, 10_000) == 10
+    assert _treeshap.max_rows(paths, 10) == 1
+
+
+def test_linear_explanation_adds_up(monkeypatch, data):
+    X, y = data
+    model = LinearRegression().fit(X, y)
+    monkeypatch.setattr(predict, "MODEL", model)
+    monkeypatch.setattr(predict, "TREE_PATHS", None)
+    assert predict.explainable()
+    base, phi = predict.explain(X[:10])
+    np.testing.assert_allclose(phi, X[:10] * model.coef_)
+    np.testing.assert_allclose(base + phi.sum(axis=1), model.predict(X[:10]))